@@ -1,14 +1,164 @@
 """CPU functionality."""
 
+import os
 import sys
+from functools import partial
+
+# CMP flag values indexed by (a > b) - (a < b) + 1, i.e. less-than, equal,
+# greater-than
+_CMP_FLAGS = (0b00000100, 0b00000001, 0b00000010)
+
+# Opcode values for the implemented instructions (see LS8-spec.md)
+OP_HLT = 0b00000001
+OP_RET = 0b00010001
+OP_PUSH = 0b01000101
+OP_POP = 0b01000110
+OP_PRN = 0b01000111
+OP_CALL = 0b01010000
+OP_JMP = 0b01010100
+OP_JEQ = 0b01010101
+OP_JNE = 0b01010110
+OP_JGT = 0b01010111
+OP_JLT = 0b01011000
+OP_JLE = 0b01011001
+OP_JGE = 0b01011010
+OP_NOT = 0b01101001
+OP_LDI = 0b10000010
+OP_ADDI = 0b10001111
+OP_ADD = 0b10100000
+OP_MUL = 0b10100010
+OP_MOD = 0b10100100
+OP_CMP = 0b10100111
+OP_AND = 0b10101000
+OP_OR = 0b10101010
+OP_XOR = 0b10101011
+OP_SHL = 0b10101100
+OP_SHR = 0b10101101
+
+# Pseudo-opcodes for fused instruction pairs (superinstructions). These sit
+# above the 8-bit opcode space so they can never collide with real LS-8
+# opcodes; they only ever appear in decoded-cache entries, never in ram.
+OP_LDI_LDI = 0x100
+OP_LDI_PRN = 0x101
 
 class CPU:
     """Main CPU class."""
 
+    # Fixed attribute layout: turns the per-instance dict lookups on self
+    # into fixed-offset loads, and catches attribute typos
+    __slots__ = (
+        "ram",
+        "reg",
+        "pc",
+        "ir",
+        "fl",
+        "running",
+        "decoded",
+        "dispatch",
+        "pc_advance",
+    )
+
+    """
+    PC Mutators
+    CALL 01010000 00000rrr
+    RET  00010001
+
+    INT  01010010 00000rrr
+    IRET 00010011
+
+    JMP  01010100 00000rrr
+    JEQ  01010101 00000rrr
+    JNE  01010110 00000rrr
+    JGT  01010111 00000rrr
+    JLT  01011000 00000rrr
+    JLE  01011001 00000rrr
+    JGE  01011010 00000rrr
+
+    Other
+    NOP  00000000
+
+    HLT  00000001
+
+    LDI  10000010 00000rrr iiiiiiii
+
+    LD   10000011 00000aaa 00000bbb
+    ST   10000100 00000aaa 00000bbb
+
+    PUSH 01000101 00000rrr
+    POP  01000110 00000rrr
+
+    PRN  01000111 00000rrr
+    PRA  01001000 00000rrr
+
+    ALU ops
+    ADD  10100000 00000aaa 00000bbb
+    SUB  10100001 00000aaa 00000bbb
+    MUL  10100010 00000aaa 00000bbb
+    DIV  10100011 00000aaa 00000bbb
+    MOD  10100100 00000aaa 00000bbb
+
+    INC  01100101 00000rrr
+    DEC  01100110 00000rrr
+
+    CMP  10100111 00000aaa 00000bbb
+
+    AND  10101000 00000aaa 00000bbb
+    NOT  01101001 00000rrr
+    OR   10101010 00000aaa 00000bbb
+    XOR  10101011 00000aaa 00000bbb
+    SHL  10101100 00000aaa 00000bbb
+    SHR  10101101 00000aaa 00000bbb
+    """
+
+    # Opcode byte -> handler method name, shared by every instance; __init__
+    # only binds the named methods into the per-instance dispatch list.
+    _HANDLERS = {
+        # PC mutators
+        OP_CALL: "call",
+        OP_RET: "ret",
+        OP_JMP: "jmp",
+        # other
+        OP_HLT: "hlt",
+        OP_LDI: "ldi",
+        OP_ADDI: "addi",
+        OP_PUSH: "push",
+        OP_POP: "pop",
+        OP_PRN: "prn",
+        # ALU ops
+        OP_ADD: "alu_add",
+        OP_MUL: "alu_mul",
+        OP_MOD: "alu_mod",
+        OP_CMP: "alu_cmp",
+        OP_AND: "alu_and",
+        OP_NOT: "alu_not",
+        OP_OR: "alu_or",
+        OP_XOR: "alu_xor",
+        OP_SHL: "alu_shl",
+        OP_SHR: "alu_shr",
+    }
+
+    # Conditional jumps: opcode -> (FL mask, whether any masked bit must be
+    # set for the jump to be taken). One shared handler covers all six.
+    _JCOND = {
+        OP_JEQ: (0b00000001, True),
+        OP_JNE: (0b00000001, False),
+        OP_JGT: (0b00000010, True),
+        OP_JLT: (0b00000100, True),
+        OP_JLE: (0b00000101, True),
+        OP_JGE: (0b00000011, True),
+    }
+
+    # Per-opcode PC advance, derived once from the instruction layout
+    # `AABCDDDD`: 0 if the C bit says the instruction sets the PC itself,
+    # otherwise 1 plus the AA operand count.
+    _PC_ADVANCE = tuple(
+        0 if (op >> 4) & 1 else 1 + (op >> 6) for op in range(256)
+    )
+
     def __init__(self):
         """Construct a new CPU."""
 
-        self.ram = [0] * 256    # 256 bytes of memory
+        self.ram = bytearray(256)   # 256 bytes of memory
 
         """
         REGISTERS
@@ -24,7 +174,7 @@ class CPU:
         > register values in that range.
         """
 
-        self.reg = [0] * 8      # 8 general purpose registers
+        self.reg = bytearray(8) # 8 general purpose registers
         self.reg[5] = 0         # interrupt mask
         self.reg[6] = 0         # interrupt status
         self.reg[7] = 0xF4      # stack pointer
@@ -40,10 +190,9 @@ class CPU:
         """
 
         self.pc = 0             # program counter
-        self.ir = 0             # instruction register 
-        self.mar = 0            # memory address register
-        self.mdr = 0            # memory data register
+        self.ir = 0             # instruction register
         self.fl = 0             # flags
+        self.running = False    # set by run(), cleared by HLT
 
         """
         The flags register `FL` holds the current flags status. These flags
@@ -60,85 +209,39 @@ class CPU:
         * `E` Equal: during a `CMP`, set to 1 if registerA is equal to registerB, zero
         otherwise.
         """
-        
-        self.branch_table = dict()
-        """
-        PC Mutators
-        CALL 01010000 00000rrr
-        RET  00010001
-
-        INT  01010010 00000rrr
-        IRET 00010011
-
-        JMP  01010100 00000rrr
-        JEQ  01010101 00000rrr
-        JNE  01010110 00000rrr
-        JGT  01010111 00000rrr
-        JLT  01011000 00000rrr
-        JLE  01011001 00000rrr
-        JGE  01011010 00000rrr
-        """
-        self.branch_table[0b01010000] = self.call
-        self.branch_table[0b00010001] = self.ret
-        self.branch_table[0b01010100] = self.jmp
-        self.branch_table[0b01010101] = self.jeq
-        self.branch_table[0b01010110] = self.jne
-        """
-        Other
-        NOP  00000000
-
-        HLT  00000001 
 
-        LDI  10000010 00000rrr iiiiiiii
+        # Decoded-instruction cache: one slot per ram address holding an
+        # (opcode, handler, operand_a, operand_b, pc_advance) tuple.
+        # pc_advance is 0 for instructions that set the PC themselves
+        # (CALL, RET, the jumps).
+        self.decoded = [None] * 256
 
-        LD   10000011 00000aaa 00000bbb
-        ST   10000100 00000aaa 00000bbb
+        # Shared per-opcode PC advance table, built once at class level
+        self.pc_advance = self._PC_ADVANCE
 
-        PUSH 01000101 00000rrr
-        POP  01000110 00000rrr
+        # Dispatch table: one slot per possible opcode byte, so decoding an
+        # instruction is a single list index instead of a dict probe. The
+        # opcode->name map is class-level; only the method binding happens
+        # per instance.
+        self.dispatch = [None] * 256
+        for opcode, name in self._HANDLERS.items():
+            self.dispatch[opcode] = getattr(self, name)
+        for opcode, (mask, taken_if_set) in self._JCOND.items():
+            self.dispatch[opcode] = partial(self.jcond, mask, taken_if_set)
 
-        PRN  01000111 00000rrr
-        PRA  01001000 00000rrr
+    def hlt(self, reg_a, reg_b):
         """
-        self.branch_table[0b10000010] = self.ldi
-        self.branch_table[0b10001111] = self.addi
-        self.branch_table[0b01000101] = self.push
-        self.branch_table[0b01000110] = self.pop
-        self.branch_table[0b01000111] = self.prn
-
-        self.alu_branch_table = dict()
-        """
-        ALU ops
-        ADD  10100000 00000aaa 00000bbb
-        SUB  10100001 00000aaa 00000bbb
-        MUL  10100010 00000aaa 00000bbb
-        DIV  10100011 00000aaa 00000bbb
-        MOD  10100100 00000aaa 00000bbb
-
-        INC  01100101 00000rrr
-        DEC  01100110 00000rrr
+        Halt the CPU (and exit the emulator).
 
-        CMP  10100111 00000aaa 00000bbb
-
-        AND  10101000 00000aaa 00000bbb
-        NOT  01101001 00000rrr
-        OR   10101010 00000aaa 00000bbb
-        XOR  10101011 00000aaa 00000bbb
-        SHL  10101100 00000aaa 00000bbb
-        SHR  10101101 00000aaa 00000bbb
+        Machine code:
+        ```
+        00000001
+        01
+        ```
         """
-        self.alu_branch_table[0b10100000] = self.alu_add
-        self.alu_branch_table[0b10100010] = self.alu_mul
-        self.alu_branch_table[0b10100100] = self.alu_mod
-        self.alu_branch_table[0b10100111] = self.alu_cmp
-        self.alu_branch_table[0b10101000] = self.alu_and
-        self.alu_branch_table[0b01101001] = self.alu_not
-        self.alu_branch_table[0b10101010] = self.alu_or
-        self.alu_branch_table[0b10101011] = self.alu_xor
-        self.alu_branch_table[0b10101100] = self.alu_shl
-        self.alu_branch_table[0b10101101] = self.alu_shr
+        self.running = False
 
-    def addi(self):
+    def addi(self, reg_a, reg_b):
         """
         Add the value in reg_b to the value in reg_a, storing the result in reg_a.
 
@@ -148,30 +251,15 @@ class CPU:
         F 0a 0b
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
-        self.reg[reg_a] += reg_b
-        self.pc += 3
-
-    def alu_add(self):
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
-        self.reg[reg_a] += self.reg[reg_b]
-        self.pc += 3
-
-    def alu_mul(self):
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
-        self.reg[reg_a] *= self.reg[reg_b]
-        self.pc += 3
-
-    def alu_mod(self):
+        self.reg[reg_a] = (self.reg[reg_a] + reg_b) & 0xFF
+
+    def alu_add(self, reg_a, reg_b):
+        self.reg[reg_a] = (self.reg[reg_a] + self.reg[reg_b]) & 0xFF
+
+    def alu_mul(self, reg_a, reg_b):
+        self.reg[reg_a] = (self.reg[reg_a] * self.reg[reg_b]) & 0xFF
+
+    def alu_mod(self, reg_a, reg_b):
         """
         Divide the value in the first register by the value in the second,
         storing the _remainder_ of the result in registerA.
@@ -185,17 +273,12 @@ class CPU:
         A4 0a 0b
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
         if self.reg[reg_b] > 0:
             self.reg[reg_a] = self.reg[reg_a] % self.reg[reg_b]
         else:
             raise ZeroDivisionError
-        self.pc += 3
 
-    def alu_cmp(self):
+    def alu_cmp(self, reg_a, reg_b):
         """
         Compare the values in two registers.
 
@@ -213,19 +296,13 @@ class CPU:
         A7 0a 0b
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
-        if self.reg[reg_a] == self.reg[reg_b]:
-            self.fl = 0b00000001
-        elif self.reg[reg_a] > self.reg[reg_b]:
-            self.fl = 0b00000010
-        else:
-            self.fl = 0b00000100
-        self.pc += 3
+        value_a = self.reg[reg_a]
+        value_b = self.reg[reg_b]
+        # (a > b) - (a < b) is -1, 0 or 1, so this indexes the flag value
+        # directly instead of branching three ways
+        self.fl = _CMP_FLAGS[(value_a > value_b) - (value_a < value_b) + 1]
 
-    def alu_and(self):
+    def alu_and(self, reg_a, reg_b):
         """
         Bitwise-AND the values in registerA and registerB, then store the result in
         registerA.
@@ -236,14 +313,9 @@ class CPU:
         A8 0a 0b
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
         self.reg[reg_a] = self.reg[reg_a] & self.reg[reg_b]
-        self.pc += 3
 
-    def alu_not(self):
+    def alu_not(self, reg_a, reg_b):
         """
         Perform a bitwise-NOT on the value in a register, storing the result in the register.
 
@@ -253,12 +325,9 @@ class CPU:
         69 0r
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.reg[reg_a] = ~ self.reg[reg_a]
-        self.pc += 2
+        self.reg[reg_a] = ~self.reg[reg_a] & 0xFF
 
-    def alu_or(self):
+    def alu_or(self, reg_a, reg_b):
         """
         Perform a bitwise-OR between the values in registerA and registerB, storing the
         result in registerA.
@@ -269,14 +338,9 @@ class CPU:
         AA 0a 0b
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
         self.reg[reg_a] = self.reg[reg_a] | self.reg[reg_b]
-        self.pc += 3
 
-    def alu_xor(self):
+    def alu_xor(self, reg_a, reg_b):
         """
         Perform a bitwise-XOR between the values in registerA and registerB, storing the
         result in registerA.
@@ -287,14 +351,9 @@ class CPU:
         AB 0a 0b
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
         self.reg[reg_a] = self.reg[reg_a] ^ self.reg[reg_b]
-        self.pc += 3
 
-    def alu_shl(self):
+    def alu_shl(self, reg_a, reg_b):
         """
         Shift the value in registerA left by the number of bits specified in registerB,
         filling the low bits with 0.
@@ -304,14 +363,9 @@ class CPU:
         AC 0a 0b
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
-        self.reg[reg_a] = self.reg[reg_a] << self.reg[reg_b]
-        self.pc += 3
+        self.reg[reg_a] = (self.reg[reg_a] << self.reg[reg_b]) & 0xFF
 
-    def alu_shr(self):
+    def alu_shr(self, reg_a, reg_b):
         """
         Shift the value in registerA right by the number of bits specified in registerB,
         filling the high bits with 0.
@@ -321,22 +375,12 @@ class CPU:
         AD 0a 0b
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
         self.reg[reg_a] = self.reg[reg_a] >> self.reg[reg_b]
-        self.pc += 3
 
-    def ldi(self):
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar += 1
-        reg_b = self.ram_read()
+    def ldi(self, reg_a, reg_b):
         self.reg[reg_a] = reg_b
-        self.pc += 3
 
-    def push(self):
+    def push(self, reg_a, reg_b):
         """
         Push the value in the given register on the stack.
 
@@ -345,20 +389,15 @@ class CPU:
         `SP`.
 
         Machine code:
-        
+
         01000101 00000rrr
         45 0r
-        
+
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.reg[7] -= 1
-        self.mar = self.reg[7]
-        self.mdr = self.reg[reg_a]
-        self.ram_write()
-        self.pc += 2
+        self.reg[7] = (self.reg[7] - 1) & 0xFF
+        self.ram_write(self.reg[7], self.reg[reg_a])
 
-    def pop(self):
+    def pop(self, reg_a, reg_b):
         """
         Pop the value at the top of the stack into the given register.
 
@@ -366,19 +405,15 @@ class CPU:
         2. Increment `SP`.
 
         Machine code:
-        
+
         01000110 00000rrr
         46 0r
-        
+
         """
-        self.mar += 1
-        reg_a = self.ram_read()
-        self.mar = self.reg[7]
-        self.reg[reg_a] = self.ram_read()
-        self.reg[7] += 1
-        self.pc += 2
+        self.reg[reg_a] = self.ram[self.reg[7]]
+        self.reg[7] = (self.reg[7] + 1) & 0xFF
 
-    def call(self):
+    def call(self, reg_a, reg_b):
         """
         Calls a subroutine (function) at the address stored in the register.
 
@@ -392,18 +427,14 @@ class CPU:
         50 0r
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
         # decrement the stack pointer
-        self.reg[7] -= 1
-        # copy the value at memory address program counter + 2 to the address pointed at by the stack pointer
-        self.mar = self.reg[7]
-        self.mdr = self.pc + 2
-        self.ram_write()
+        self.reg[7] = (self.reg[7] - 1) & 0xFF
+        # copy the address of the instruction after the CALL to the address pointed at by the stack pointer
+        self.ram_write(self.reg[7], self.pc + 2)
         # set the pc to the address stored in the given register
         self.pc = self.reg[reg_a]
 
-    def ret(self):
+    def ret(self, reg_a, reg_b):
         """
         Return from subroutine.
 
@@ -416,12 +447,11 @@ class CPU:
         ```
         """
         # copy the value from the top of the stack into the pc
-        self.mar = self.reg[7]
-        self.pc = self.ram_read()
+        self.pc = self.ram[self.reg[7]]
         # increment the stack pointer
-        self.reg[7] += 1
+        self.reg[7] = (self.reg[7] + 1) & 0xFF
 
-    def jmp(self):
+    def jmp(self, reg_a, reg_b):
         """
         Jump to the address stored in the given register.
 
@@ -433,93 +463,212 @@ class CPU:
         54 0r
         ```
         """
-        self.mar += 1
-        reg_a = self.ram_read()
         self.pc = self.reg[reg_a]
 
-    def jeq(self):
+    def jcond(self, mask, taken_if_set, reg_a, reg_b):
         """
-        If `equal` flag is set (true), jump to the address stored in the given register.
+        Shared handler for the conditional jumps (JEQ, JNE, JGT, JLT, JLE,
+        JGE). mask and taken_if_set come from the _JCOND table via
+        functools.partial: jump to the address stored in the given register
+        if the masked `FL` bits match the expected state, otherwise fall
+        through to the next instruction.
 
         Machine code:
         ```
-        01010101 00000rrr
-        55 0r
-        ```
-        """
-        if self.fl == 0b00000001:
-            self.mar += 1
-            reg_a = self.ram_read()
-            self.pc = self.reg[reg_a]
-        else:
-            self.pc += 2
-
-    def jne(self):
-        """
-        If `E` flag is clear (false, 0), jump to the address stored in the given
-        register.
-
-        Machine code:
+        01010101 00000rrr    JEQ ... 01011010 00000rrr    JGE
+        55 0r                        5A 0r
         ```
-        01010110 00000rrr
-        56 0r
         """
-        if self.fl & 0b00000001 == 0:
-            self.mar += 1
-            reg_a = self.ram_read()
+        if bool(self.fl & mask) == taken_if_set:
             self.pc = self.reg[reg_a]
         else:
             self.pc += 2
 
-    def prn(self):
-        self.mar += 1
-        reg_a = self.ram_read()
+    def prn(self, reg_a, reg_b):
         print(self.reg[reg_a])
-        self.pc += 2
-
-    def ram_read(self):
-        return self.ram[self.mar]
-
-    def ram_write(self):
-        self.ram[self.mar] = self.mdr
-
-    def load(self):
-        """Load a program into memory."""
-
-        program = list()
-
-        with open("/Users/shaunorpen/Lambda/ls8/ls8/examples/sctest.ls8") as f:
-            for line in f:
-                line_values = line.split("#")
-                instruction_string = line_values[0]
-                if len(instruction_string) > 0:
-                    program.append(int(instruction_string.strip(), 2))
-
-        for i in range(len(program)):
-            self.mar = i
-            self.mdr = program[i]
-            self.ram_write()
 
-    def alu(self):
-        """ALU operations."""
-        self.alu_branch_table[self.ir]()
+    def ram_read(self, address):
+        return self.ram[address]
+
+    def ram_write(self, address, value):
+        # ram is a bytearray, so mask the value to the 8 bits it can hold
+        self.ram[address] = value & 0xFF
+        # The write may have clobbered an opcode, an operand byte, or the
+        # tail of a fused pair whose cache entry starts up to 5 bytes back,
+        # so drop every entry that could cover this address.
+        start = address - 5 if address >= 5 else 0
+        self.decoded[start:address + 1] = [None] * (address + 1 - start)
+
+    def trace(self):
+        """
+        Handy function to print out the CPU state: the PC, the three bytes
+        at the PC, and the registers. You might want to call this from run()
+        if you need help debugging. It builds the whole line with one format
+        string and a single print so tracing every instruction stays cheap.
+        """
+        print(
+            "TRACE: %02X | %02X %02X %02X | %02X %02X %02X %02X %02X %02X %02X %02X"
+            % (
+                self.pc,
+                self.ram[self.pc],
+                self.ram[self.pc + 1],
+                self.ram[self.pc + 2],
+                *self.reg,
+            )
+        )
+
+    def decode(self, address):
+        """
+        Decode the instruction at the given address into a
+        (opcode, handler, operand_a, operand_b, pc_advance) tuple, cache it, and
+        return it.
+
+        Instruction layout is `AABCDDDD` where `AA` is the number of operands
+        and `C` is set if the instruction writes the PC itself; those
+        instructions get a pc_advance of 0 and manage the PC in their handler.
+        """
+        # Pull the opcode and both operand bytes with one slice instead of
+        # three separate subscripts
+        ir, operand_a, operand_b = self.ram[address:address + 3]
+        # Fuse the common LDI,LDI and LDI,PRN pairs into one entry so they
+        # cost a single dispatch. Safe because LDI always falls through to
+        # the next instruction; a jump landing on the second instruction
+        # still gets its own cache entry at that address.
+        if ir == OP_LDI and address + 5 < len(self.ram):
+            follower = self.ram[address + 3]
+            if follower == OP_LDI:
+                entry = (
+                    OP_LDI_LDI,
+                    None,
+                    (operand_a, operand_b,
+                     self.ram[address + 4], self.ram[address + 5]),
+                    0,
+                    6,
+                )
+                self.decoded[address] = entry
+                return entry
+            if follower == OP_PRN:
+                entry = (
+                    OP_LDI_PRN,
+                    None,
+                    (operand_a, operand_b, self.ram[address + 4]),
+                    0,
+                    5,
+                )
+                self.decoded[address] = entry
+                return entry
+        entry = (
+            ir,
+            self.dispatch[ir],
+            operand_a,
+            operand_b,
+            self.pc_advance[ir],
+        )
+        self.decoded[address] = entry
+        return entry
+
+    def load(self, path=None, program_bytes=None):
+        """
+        Load a program into memory.
+
+        Takes either the path of an .ls8 source file or a program_bytes
+        buffer of raw machine code (useful for tests and benchmarks that
+        build programs in memory). With neither, loads the bundled print8
+        example.
+        """
+
+        if program_bytes is None:
+            if path is None:
+                path = os.path.join(
+                    os.path.dirname(__file__), "examples", "print8.ls8"
+                )
+            with open(path) as f:
+                program_bytes = bytes(
+                    int(code, 2)
+                    for code in (line.partition("#")[0].strip() for line in f)
+                    if code
+                )
+
+        # The bulk copy below bypasses ram_write(), so drop any decode-cache
+        # entries left over from a previously loaded program (in place, since
+        # run() aliases the list).
+        self.decoded[:] = [None] * len(self.decoded)
+
+        # One bulk copy into ram instead of a per-byte write loop
+        self.ram[:len(program_bytes)] = program_bytes
 
     def run(self):
         """Run the CPU."""
-        # Read the first instruction
-        self.mar = self.pc
-        self.ir = self.ram_read()
-        # If the instruction is anything other than HLT, run the program
-        while not self.ir == 0b00000001:
-            # Execute the instruction
-            # If ALU operation, call the ALU
-            if self.ir & 0b00100000 == 0b00100000:
-                self.alu()
-            # Otherwise call the cpu branch table
-            else: 
-                self.branch_table[self.ir]()
-            # Read next instruction
-            self.mar = self.pc
-            self.ir = self.ram_read()
-            # Loop
-            self.run()
\ No newline at end of file
+        # Bind the loop's hot lookups to locals: LOAD_FAST beats LOAD_ATTR on
+        # every iteration. The PC stays on self because CALL/RET/jumps write
+        # it from their handlers.
+        decoded = self.decoded
+        decode = self.decode
+        reg = self.reg
+        ram = self.ram
+        pc = self.pc
+        self.running = True
+        while self.running:
+            # Fetch the decoded instruction, decoding on demand if the cache
+            # entry was never filled or was invalidated by a ram write.
+            entry = decoded[pc]
+            if entry is None:
+                entry = decode(pc)
+            ir, handler, reg_a, reg_b, advance = entry
+            # Inline the hottest opcodes so the common case is one compare
+            # and branch instead of a method call; the PC stays in the local
+            # throughout, so these never touch self.pc. Everything else
+            # falls through to the dispatch table.
+            if ir == 0b10000010:    # LDI
+                reg[reg_a] = reg_b
+                pc += 3
+                continue
+            if ir == 0x100:         # fused LDI,LDI
+                reg_to_a, value_a, reg_to_b, value_b = reg_a
+                reg[reg_to_a] = value_a
+                reg[reg_to_b] = value_b
+                pc += 6
+                continue
+            if ir == 0x101:         # fused LDI,PRN
+                reg_to, value, reg_from = reg_a
+                reg[reg_to] = value
+                print(reg[reg_from])
+                pc += 5
+                continue
+            if ir == 0b10100000:    # ADD
+                reg[reg_a] = (reg[reg_a] + reg[reg_b]) & 0xFF
+                pc += 3
+                continue
+            if ir == 0b10100010:    # MUL
+                reg[reg_a] = (reg[reg_a] * reg[reg_b]) & 0xFF
+                pc += 3
+                continue
+            if ir == 0b01000111:    # PRN
+                print(reg[reg_a])
+                pc += 2
+                continue
+            if ir == 0b10100111:    # CMP
+                value_a = reg[reg_a]
+                value_b = reg[reg_b]
+                self.fl = _CMP_FLAGS[(value_a > value_b) - (value_a < value_b) + 1]
+                pc += 3
+                continue
+            if ir == 0b01010101:    # JEQ
+                pc = reg[reg_a] if self.fl & 0b00000001 else pc + 2
+                continue
+            if ir == 0b01010110:    # JNE
+                pc = pc + 2 if self.fl & 0b00000001 else reg[reg_a]
+                continue
+            if ir == 0b01000110:    # POP
+                sp = reg[7]
+                reg[reg_a] = ram[sp]
+                reg[7] = (sp + 1) & 0xFF
+                pc += 2
+                continue
+            # Cold path: sync the local PC so handlers like CALL see the
+            # right value, and read it back from the PC mutators (which have
+            # an advance of 0).
+            self.pc = pc
+            handler(reg_a, reg_b)
+            pc = pc + advance if advance else self.pc
+        self.pc = pc
@@ -5,7 +5,11 @@
 import sys
 from cpu import *
 
+if len(sys.argv) != 2:
+    print("usage: ls8.py progname", file=sys.stderr)
+    sys.exit(1)
+
 cpu = CPU()
 
-cpu.load()
+cpu.load(sys.argv[1])
 cpu.run()
\ No newline at end of file